@@ -4,6 +4,9 @@
 from __future__ import print_function, division
 from sklearn import manifold
 from sklearn.decomposition import PCA
+from sklearn.metrics import pairwise_distances
+from sklearn.metrics.pairwise import PAIRWISE_BOOLEAN_FUNCTIONS
+from joblib import effective_n_jobs
 from scipy.spatial.distance import pdist, squareform
 import scipy.spatial
 import numpy as np
@@ -79,7 +82,11 @@ def sgd(D, n_components=2, random_state=None, init=None):
         raise NotImplementedError
     _logger.debug("Performing SGD MDS on " "{} of shape {}...".format(type(D), D.shape))
     N = D.shape[0]
-    D = squareform(D)
+    # s_gd2 only accepts double precision
+    D = squareform(D).astype(np.float64, copy=False)
+    if init is not None:
+        # s_gd2 overwrites its initialization
+        init = np.array(init, dtype=np.float64)
     # Metric MDS from s_gd2
     Y = s_gd2.mds_direct(N, D, init=init, random_seed=random_state)
     return Y
@@ -145,6 +152,21 @@ def smacof(
         init=init,
         verbose=verbose,
     )
+    if np.any(~np.isfinite(Y)) and D.dtype != np.float64:
+        _logger.warning(
+            "SMACOF returned NaN in {}. Retrying with float64".format(D.dtype)
+        )
+        return smacof(
+            D.astype(np.float64),
+            n_components=n_components,
+            metric=metric,
+            init=init,
+            random_state=random_state,
+            verbose=verbose,
+            max_iter=max_iter,
+            eps=eps,
+            n_jobs=n_jobs,
+        )
     return Y
 
 
@@ -166,7 +188,9 @@ def embed_MDS(
     Parameters
     ----------
     X: ndarray [n_samples, n_features]
-        2 dimensional input data array with n_samples
+        2 dimensional input data array with n_samples.
+        SMACOF runs in the precision of `X`, falling back to float64
+        if single precision fails to converge
 
     n_dim : int, optional, default: 2
         number of dimensions in which the data will be embedded
@@ -185,7 +209,7 @@ def embed_MDS(
         for all figures in the PHATE paper.
 
     n_jobs : integer, optional, default: 1
-        The number of jobs to use for the computation.
+        The number of jobs to use for computing pairwise distances.
         If -1 all CPUs are used. If 1 is given, no parallel computing code is
         used at all, which is useful for debugging.
         For n_jobs below -1, (n_cpus + 1 + n_jobs) are used. Thus for
@@ -216,7 +240,19 @@ def embed_MDS(
         )
 
     # MDS embeddings, each gives a different output.
-    X_dist = squareform(pdist(X, distance_metric))
+    _logger.debug(
+        "Computing {} distances with {} jobs...".format(
+            distance_metric, effective_n_jobs(n_jobs)
+        )
+    )
+    if distance_metric in PAIRWISE_BOOLEAN_FUNCTIONS:
+        # sklearn would convert the potential to boolean
+        X_dist = squareform(pdist(X, distance_metric))
+    else:
+        X_dist = pairwise_distances(X, metric=distance_metric, n_jobs=n_jobs)
+        # BLAS-based distances are not exactly symmetric. The input
+        # precision is kept: SMACOF is memory-bound on X_dist
+        X_dist = (X_dist + X_dist.T) / 2
 
     # initialize all by CMDS
     Y_classic = classic(X_dist, n_components=ndim, random_state=seed)
@@ -10,7 +10,8 @@ import numpy as np
 import graphtools
 from sklearn.base import BaseEstimator
 from sklearn.exceptions import NotFittedError
-from scipy import sparse
+from sklearn.preprocessing import normalize
+from scipy import sparse, linalg
 import warnings
 import tasklogger
 
@@ -30,8 +31,169 @@ except ImportError:
     # anndata not installed
     pass
 
+try:
+    import cupy
+except ImportError:
+    # cupy not installed
+    pass
+
 _logger = tasklogger.get_tasklogger("graphtools")
 
+# accepted parameter values
+_KNN_DISTANCES = frozenset(
+    [
+        "euclidean",
+        "precomputed",
+        "cosine",
+        "correlation",
+        "cityblock",
+        "l1",
+        "l2",
+        "manhattan",
+        "braycurtis",
+        "canberra",
+        "chebyshev",
+        "dice",
+        "hamming",
+        "jaccard",
+        "kulsinski",
+        "mahalanobis",
+        "matching",
+        "minkowski",
+        "rogerstanimoto",
+        "russellrao",
+        "seuclidean",
+        "sokalmichener",
+        "sokalsneath",
+        "sqeuclidean",
+        "yule",
+        "precomputed_affinity",
+        "precomputed_distance",
+    ]
+)
+_MDS_DISTANCES = frozenset(
+    [
+        "euclidean",
+        "cosine",
+        "correlation",
+        "braycurtis",
+        "canberra",
+        "chebyshev",
+        "cityblock",
+        "dice",
+        "hamming",
+        "jaccard",
+        "kulsinski",
+        "mahalanobis",
+        "matching",
+        "minkowski",
+        "rogerstanimoto",
+        "russellrao",
+        "seuclidean",
+        "sokalmichener",
+        "sokalsneath",
+        "sqeuclidean",
+        "yule",
+    ]
+)
+_MDS_METHODS = ("classic", "metric", "nonmetric")
+_MDS_SOLVERS = ("sgd", "smacof")
+_DTYPES = ("float32", "float64")
+_BACKENDS = ("auto", "numpy", "cupy")
+
+
+def _matrix_power(A, t, scratch=None):
+    """Raise a dense square matrix to a positive integer power
+
+    Binary exponentiation as in `np.linalg.matrix_power`, but each matrix
+    product is written by BLAS into a recycled buffer rather than a newly
+    allocated array. At most three buffers of the size of `A` are used.
+
+    Parameters
+    ----------
+    A : array-like, shape=[n, n]
+        matrix to be powered. Not modified
+
+    t : int
+        power, `t >= 1`
+
+    scratch : list, optional
+        Work buffers to reuse across calls. Buffers are taken from and
+        returned to this list; the result is never one of them.
+
+    Returns
+    -------
+    A_t : np.ndarray, shape=[n, n]
+        An array not shared with `A` or `scratch`
+    """
+    A = np.ascontiguousarray(A)
+    if scratch is None:
+        free = []
+    else:
+        free = scratch
+        free[:] = [b for b in free if b.shape == A.shape and b.dtype == A.dtype]
+    result = None
+    base = A
+    while True:
+        if t & 1:
+            if result is None:
+                result = base
+            else:
+                out = free.pop() if free else np.empty_like(A)
+                np.dot(result, base, out=out)
+                if result is not A and result is not base:
+                    free.append(result)
+                result = out
+        t >>= 1
+        if not t:
+            break
+        out = free.pop() if free else np.empty_like(A)
+        np.dot(base, base, out=out)
+        if base is not A and base is not result:
+            free.append(base)
+        base = out
+    if base is not A and base is not result:
+        free.append(base)
+    if result is A:
+        result = result.copy()
+    return result
+
+
+class _PrecomputedDiffOp(object):
+    """Minimal stand-in for a `graphtools` graph on a precomputed affinity
+
+    The affinity matrix is row-normalized into a diffusion operator as-is,
+    without symmetrization or landmarking.
+
+    Parameters
+    ----------
+    K : array-like, shape=[n_samples, n_samples]
+        affinity matrix
+    """
+
+    precomputed = "affinity"
+    n_pca = None
+
+    def __init__(self, K):
+        if sparse.issparse(K):
+            K = K.tocsr()
+        else:
+            K = np.asarray(K)
+        self.data = K
+        self.kernel = K
+        self.kernel_degree = np.asarray(K.sum(axis=1)).reshape(-1, 1)
+        self.diff_op = normalize(K, "l1", axis=1)
+
+    def set_params(self, **params):
+        if "precomputed" in params and params["precomputed"] != self.precomputed:
+            raise ValueError("Cannot update precomputed. Please create a new graph")
+        return self
+
+    def extend_to_data(self, data, **kwargs):
+        raise ValueError(
+            "Cannot transform additional data using a precomputed affinity matrix."
+        )
+
 
 class PHATE(BaseEstimator):
     """PHATE operator which performs dimensionality reduction.
@@ -115,6 +277,21 @@ class PHATE(BaseEstimator):
     verbose : `int` or `boolean`, optional (default: 1)
         If `True` or `> 0`, print status messages
 
+    dtype : numpy dtype, optional, default: np.float32
+        Floating point precision in which the diffusion potential is computed.
+        Single precision is sufficient for the embedding and roughly twice as
+        fast; use `np.float64` to reproduce double precision results.
+
+    skip_kernel : boolean, optional, default: False
+        If True and `data` is a precomputed affinity matrix, it is used
+        directly as the kernel without building a `graphtools.Graph`. The
+        affinity matrix should be symmetric. Landmarking is not performed.
+
+    backend : {'auto', 'numpy', 'cupy'}, optional, default: 'auto'
+        Library used for the eigendecomposition of the diffusion operator.
+        If 'auto', `cupy` is used when it is installed and the GPU has enough
+        free memory, and `numpy` otherwise.
+
     potential_method : deprecated.
         Use `gamma=1` for log transformation and `gamma=0` for square root
         transformation.
@@ -139,7 +316,8 @@ class PHATE(BaseEstimator):
     embedding : array-like, shape=[n_samples, n_components]
         Stores the position of the dataset in the embedding space
 
-    diff_op :  array-like, shape=[n_samples, n_samples] or [n_landmark, n_landmark]
+    diff_op :  array-like or sparse matrix, shape=[n_samples, n_samples]
+        or [n_landmark, n_landmark]
         The diffusion operator built from the graph
 
     graph : graphtools.base.BaseGraph
@@ -171,6 +349,22 @@ class PHATE(BaseEstimator):
         `BioRxiv <http://biorxiv.org/content/early/2017/03/24/120378>`_.
     """
 
+    # parameters handled by `set_params` and the results they invalidate
+    _PARAM_RESETS = {
+        "n_components": "embedding",
+        "mds": "embedding",
+        "mds_solver": "embedding",
+        "mds_dist": "embedding",
+        "t": "potential",
+        "gamma": "potential",
+        "dtype": "potential",
+        "knn": "kernel",
+        "decay": "kernel",
+        "knn_dist": "kernel",
+        "skip_kernel": "kernel",
+    }
+    _PARAM_ALIASES = {"k": "knn", "a": "decay"}
+
     def __init__(
         self,
         n_components=2,
@@ -187,6 +381,9 @@ class PHATE(BaseEstimator):
         n_jobs=1,
         random_state=None,
         verbose=1,
+        dtype=np.float32,
+        skip_kernel=False,
+        backend="auto",
         potential_method=None,
         alpha_decay=None,
         njobs=None,
@@ -209,9 +406,17 @@ class PHATE(BaseEstimator):
         self.mds_dist = mds_dist
         self.mds_solver = mds_solver
         self.random_state = random_state
+        self.dtype = dtype
+        self.skip_kernel = skip_kernel
+        self.backend = backend
         self.kwargs = kwargs
 
         self.graph = None
+        self._graph_params = None
+        self._diff_op_cache = None
+        self._diff_op_eig = None
+        self._diff_scratch = []
+        self._vne = None
         self._diff_potential = None
         self.embedding = None
         self.X = None
@@ -271,14 +476,27 @@ class PHATE(BaseEstimator):
     def diff_op(self):
         """The diffusion operator calculated from the data
         """
+        diff_op = self._graph_diff_op()
+        if sparse.issparse(diff_op):
+            diff_op = diff_op.toarray()
+        return diff_op
+
+    def _graph_diff_op(self):
+        """The diffusion operator as stored by the graph (cached)
+
+        Returns
+        -------
+        diff_op : array-like or sparse matrix, shape=[n_samples, n_samples]
+            The landmark operator or the graph's diffusion operator,
+            without densifying it
+        """
         if self.graph is not None:
-            if isinstance(self.graph, graphtools.graphs.LandmarkGraph):
-                diff_op = self.graph.landmark_op
-            else:
-                diff_op = self.graph.diff_op
-            if sparse.issparse(diff_op):
-                diff_op = diff_op.toarray()
-            return diff_op
+            if self._diff_op_cache is None:
+                if isinstance(self.graph, graphtools.graphs.LandmarkGraph):
+                    self._diff_op_cache = self.graph.landmark_op
+                else:
+                    self._diff_op_cache = self.graph.diff_op
+            return self._diff_op_cache
         else:
             raise NotFittedError(
                 "This PHATE instance is not fitted yet. Call "
@@ -326,67 +544,18 @@ class PHATE(BaseEstimator):
         )
         utils.check_if_not("auto", utils.check_positive, utils.check_int, t=self.t)
         if not callable(self.knn_dist):
-            utils.check_in(
-                [
-                    "euclidean",
-                    "precomputed",
-                    "cosine",
-                    "correlation",
-                    "cityblock",
-                    "l1",
-                    "l2",
-                    "manhattan",
-                    "braycurtis",
-                    "canberra",
-                    "chebyshev",
-                    "dice",
-                    "hamming",
-                    "jaccard",
-                    "kulsinski",
-                    "mahalanobis",
-                    "matching",
-                    "minkowski",
-                    "rogerstanimoto",
-                    "russellrao",
-                    "seuclidean",
-                    "sokalmichener",
-                    "sokalsneath",
-                    "sqeuclidean",
-                    "yule",
-                    "precomputed_affinity",
-                    "precomputed_distance",
-                ],
-                knn_dist=self.knn_dist,
-            )
+            utils.check_in(_KNN_DISTANCES, knn_dist=self.knn_dist)
         if not callable(self.mds_dist):
-            utils.check_in(
-                [
-                    "euclidean",
-                    "cosine",
-                    "correlation",
-                    "braycurtis",
-                    "canberra",
-                    "chebyshev",
-                    "cityblock",
-                    "dice",
-                    "hamming",
-                    "jaccard",
-                    "kulsinski",
-                    "mahalanobis",
-                    "matching",
-                    "minkowski",
-                    "rogerstanimoto",
-                    "russellrao",
-                    "seuclidean",
-                    "sokalmichener",
-                    "sokalsneath",
-                    "sqeuclidean",
-                    "yule",
-                ],
-                mds_dist=self.mds_dist,
-            )
-        utils.check_in(["classic", "metric", "nonmetric"], mds=self.mds)
-        utils.check_in(["sgd", "smacof"], mds_solver=self.mds_solver)
+            utils.check_in(_MDS_DISTANCES, mds_dist=self.mds_dist)
+        utils.check_in(_MDS_METHODS, mds=self.mds)
+        utils.check_in(_MDS_SOLVERS, mds_solver=self.mds_solver)
+        try:
+            dtype = np.dtype(self.dtype).name
+        except TypeError:
+            # not a dtype at all: let check_in report it
+            dtype = self.dtype
+        utils.check_in(_DTYPES, dtype=dtype)
+        utils.check_in(_BACKENDS, backend=self.backend)
 
     def _set_graph_params(self, **params):
         try:
@@ -394,9 +563,22 @@ class PHATE(BaseEstimator):
         except AttributeError:
             # graph not defined
             pass
+        if self._graph_params is not None:
+            # the graph now holds these values: don't send them again
+            for key in params:
+                if key in self._graph_params:
+                    self._graph_params[key] = params[key]
 
     def _reset_graph(self):
         self.graph = None
+        self._graph_params = None
+        self._reset_diff_op()
+
+    def _reset_diff_op(self):
+        self._diff_op_cache = None
+        self._diff_op_eig = None
+        self._diff_scratch = []
+        self._vne = None
         self._reset_potential()
 
     def _reset_potential(self):
@@ -486,6 +668,17 @@ class PHATE(BaseEstimator):
         verbose : `int` or `boolean`, optional (default: 1)
             If `True` or `> 0`, print status messages
 
+        dtype : numpy dtype, optional, default: np.float32
+            Floating point precision in which the diffusion potential is
+            computed.
+
+        skip_kernel : boolean, optional, default: False
+            If True and `data` is a precomputed affinity matrix, it is used
+            directly as the kernel without building a `graphtools.Graph`.
+
+        backend : {'auto', 'numpy', 'cupy'}, optional, default: 'auto'
+            Library used for the eigendecomposition of the diffusion operator.
+
         k : Deprecated for `knn`
 
         a : Deprecated for `decay`
@@ -517,33 +710,10 @@ class PHATE(BaseEstimator):
         -------
         self
         """
-        reset_kernel = False
-        reset_potential = False
-        reset_embedding = False
-
-        # mds parameters
-        if "n_components" in params and params["n_components"] != self.n_components:
-            self.n_components = params["n_components"]
-            reset_embedding = True
-            del params["n_components"]
-        if "mds" in params and params["mds"] != self.mds:
-            self.mds = params["mds"]
-            reset_embedding = True
-            del params["mds"]
-        if "mds_solver" in params and params["mds_solver"] != self.mds_solver:
-            self.mds_solver = params["mds_solver"]
-            reset_embedding = True
-            del params["mds_solver"]
-        if "mds_dist" in params and params["mds_dist"] != self.mds_dist:
-            self.mds_dist = params["mds_dist"]
-            reset_embedding = True
-            del params["mds_dist"]
-
-        # diff potential parameters
-        if "t" in params and params["t"] != self.t:
-            self.t = params["t"]
-            reset_potential = True
-            del params["t"]
+        # deprecated parameter names
+        for alias, name in self._PARAM_ALIASES.items():
+            if alias in params:
+                params.setdefault(name, params.pop(alias))
         if "potential_method" in params:
             if params["potential_method"] == "log":
                 params["gamma"] = 1
@@ -562,45 +732,31 @@ class PHATE(BaseEstimator):
                 FutureWarning,
             )
             del params["potential_method"]
-        if "gamma" in params and params["gamma"] != self.gamma:
-            self.gamma = params["gamma"]
-            reset_potential = True
-            del params["gamma"]
-
-        # kernel parameters
-        if "k" in params and params["k"] != self.knn:
-            self.knn = params["k"]
-            reset_kernel = True
-            del params["k"]
-        if "a" in params and params["a"] != self.decay:
-            self.decay = params["a"]
-            reset_kernel = True
-            del params["a"]
-        if "knn" in params and params["knn"] != self.knn:
-            self.knn = params["knn"]
-            reset_kernel = True
-            del params["knn"]
-        if "decay" in params and params["decay"] != self.decay:
-            self.decay = params["decay"]
-            reset_kernel = True
-            del params["decay"]
+
+        # mds, diff potential and kernel parameters
+        resets = set()
+        for name, reset in self._PARAM_RESETS.items():
+            if name in params:
+                value = params.pop(name)
+                if value != getattr(self, name):
+                    setattr(self, name, value)
+                    resets.add(reset)
+
         if "n_pca" in params:
             if self.X is not None and params["n_pca"] >= np.min(self.X.shape):
                 params["n_pca"] = None
             if params["n_pca"] != self.n_pca:
                 self.n_pca = params["n_pca"]
-                reset_kernel = True
+                resets.add("kernel")
                 del params["n_pca"]
-        if "knn_dist" in params and params["knn_dist"] != self.knn_dist:
-            self.knn_dist = params["knn_dist"]
-            reset_kernel = True
-            del params["knn_dist"]
         if "n_landmark" in params and params["n_landmark"] != self.n_landmark:
             if self.n_landmark is None or params["n_landmark"] is None:
                 # need a different type of graph, reset entirely
                 self._reset_graph()
             else:
                 self._set_graph_params(n_landmark=params["n_landmark"])
+                # landmark operator is rebuilt
+                self._reset_diff_op()
             self.n_landmark = params["n_landmark"]
             del params["n_landmark"]
 
@@ -618,16 +774,24 @@ class PHATE(BaseEstimator):
             _logger.set_level(self.verbose)
             self._set_graph_params(verbose=params["verbose"])
             del params["verbose"]
+        if "backend" in params:
+            self.backend = params["backend"]
+            del params["backend"]
 
-        if reset_kernel:
+        if "kernel" in resets:
             # can't reset the graph kernel without making a new graph
             self._reset_graph()
-        if reset_potential:
+        elif "potential" in resets:
             self._reset_potential()
-        if reset_embedding:
+        elif "embedding" in resets:
             self._reset_embedding()
 
         self._set_graph_params(**params)
+        if len(params) > 0 and isinstance(
+            self.graph, graphtools.graphs.LandmarkGraph
+        ):
+            # graphtools rebuilds landmarks on e.g. `n_svd`
+            self._reset_diff_op()
 
         self._check_params()
         return self
@@ -685,6 +849,8 @@ class PHATE(BaseEstimator):
         if isinstance(X, graphtools.graphs.LandmarkGraph) or (
             isinstance(X, graphtools.base.BaseGraph) and self.n_landmark is None
         ):
+            if X is not self.graph:
+                self._reset_graph()
             self.graph = X
             X = X.data
             n_pca = self.graph.n_pca
@@ -749,6 +915,19 @@ class PHATE(BaseEstimator):
                 n_pca = self.n_pca
         return X, n_pca, precomputed, update_graph
 
+    def _get_graph_params(self, precomputed, n_pca, n_landmark):
+        return dict(
+            decay=self.decay,
+            knn=self.knn,
+            distance=self.knn_dist,
+            precomputed=precomputed,
+            n_jobs=self.n_jobs,
+            verbose=self.verbose,
+            n_pca=n_pca,
+            n_landmark=n_landmark,
+            random_state=self.random_state,
+        )
+
     def _update_graph(self, X, precomputed, n_pca, n_landmark):
         if self.X is not None and not utils.matrix_is_equivalent(X, self.X):
             """
@@ -757,18 +936,28 @@ class PHATE(BaseEstimator):
             """
             self._reset_graph()
         else:
+            params = self._get_graph_params(precomputed, n_pca, n_landmark)
+            if params == self._graph_params:
+                # warm refit: nothing to pass on to the graph
+                _logger.info("Using precomputed graph and diffusion operator...")
+                return
+            elif self._graph_params is not None:
+                # only pass on parameters that changed since the last fit
+                params = {
+                    key: value
+                    for key, value in params.items()
+                    if key not in self._graph_params or self._graph_params[key] != value
+                }
             try:
-                self.graph.set_params(
-                    decay=self.decay,
-                    knn=self.knn,
-                    distance=self.knn_dist,
-                    precomputed=precomputed,
-                    n_jobs=self.n_jobs,
-                    verbose=self.verbose,
-                    n_pca=n_pca,
-                    n_landmark=n_landmark,
-                    random_state=self.random_state,
-                )
+                if len(params) > 0:
+                    self.graph.set_params(**params)
+                    if self._graph_params is None:
+                        self._graph_params = params
+                    else:
+                        self._graph_params.update(params)
+                    if "n_landmark" in params:
+                        # landmark operator is rebuilt
+                        self._reset_diff_op()
                 _logger.info("Using precomputed graph and diffusion operator...")
             except ValueError as e:
                 # something changed that should have invalidated the graph
@@ -815,7 +1004,12 @@ class PHATE(BaseEstimator):
 
         self.X = X
 
-        if self.graph is None:
+        if self.graph is None and self.skip_kernel and precomputed == "affinity":
+            _logger.info("Using precomputed affinity matrix as kernel...")
+            self.graph = _PrecomputedDiffOp(X)
+            self._graph_params = self._get_graph_params(precomputed, n_pca, n_landmark)
+        elif self.graph is None:
+            self._graph_params = self._get_graph_params(precomputed, n_pca, n_landmark)
             with _logger.task("graph and diffusion operator"):
                 self.graph = graphtools.Graph(
                     X,
@@ -833,7 +1027,7 @@ class PHATE(BaseEstimator):
                 )
 
         # landmark op doesn't build unless forced
-        self.diff_op
+        self._graph_diff_op()
         return self
 
     def transform(self, X=None, t_max=100, plot_optimal_t=False, ax=None):
@@ -976,21 +1170,169 @@ class PHATE(BaseEstimator):
                 t = self.t
             with _logger.task("diffusion potential"):
                 # diffused diffusion operator
-                diff_op_t = np.linalg.matrix_power(self.diff_op, t)
+                diff_op_t = self._diff_op_power(t)
+                # transform in place to avoid n^2 temporaries
                 if self.gamma == 1:
                     # handling small values
-                    diff_op_t = diff_op_t + 1e-7
-                    self._diff_potential = -1 * np.log(diff_op_t)
-                elif self.gamma == -1:
-                    self._diff_potential = diff_op_t
-                else:
+                    np.add(diff_op_t, 1e-7, out=diff_op_t)
+                    np.log(diff_op_t, out=diff_op_t)
+                    np.negative(diff_op_t, out=diff_op_t)
+                elif self.gamma != -1:
                     c = (1 - self.gamma) / 2
-                    self._diff_potential = ((diff_op_t) ** c) / c
+                    np.power(diff_op_t, c, out=diff_op_t)
+                    np.divide(diff_op_t, c, out=diff_op_t)
+                self._diff_potential = diff_op_t
         elif plot_optimal_t:
             self._find_optimal_t(t_max=t_max, plot=plot_optimal_t, ax=ax)
 
         return self._diff_potential
 
+    def _diff_op_degree(self):
+        """Degree vector of the symmetric matrix underlying the diffusion operator
+
+        Returns
+        -------
+        degree : array-like, shape=[n_samples] or [n_landmark], or None
+            `d` such that `diag(d) * diff_op` is symmetric, if known
+        """
+        try:
+            degree = np.asarray(self.graph.kernel_degree).flatten()
+        except AttributeError:
+            return None
+        if isinstance(self.graph, graphtools.graphs.LandmarkGraph):
+            # the landmark operator is normalized by the total degree
+            # of the samples assigned to each landmark
+            clusters = self.graph.clusters
+            degree = np.bincount(clusters, weights=degree)[np.unique(clusters)]
+        return degree
+
+    def _use_gpu(self, A):
+        """Check whether to compute on the GPU
+
+        Parameters
+        ----------
+        A : np.ndarray
+            square matrix to be decomposed or multiplied
+
+        Returns
+        -------
+        use_gpu : bool
+        """
+        if self.backend == "numpy":
+            return False
+        try:
+            free_memory, _ = cupy.cuda.runtime.memGetInfo()
+        except NameError:
+            if self.backend == "cupy":
+                raise ImportError(
+                    "cupy not found. Please install cupy or use backend='numpy'"
+                )
+            return False
+        except cupy.cuda.runtime.CUDARuntimeError as e:
+            if self.backend == "cupy":
+                raise
+            _logger.debug("GPU not available: {}".format(e))
+            return False
+        # input, output and workspace
+        required_memory = 3 * A.nbytes
+        if required_memory > free_memory:
+            _logger.warning(
+                "Insufficient GPU memory ({:.1f} GB required, {:.1f} GB free). "
+                "Using numpy.".format(required_memory / 1e9, free_memory / 1e9)
+            )
+            return False
+        return True
+
+    def _diff_op_eigh(self):
+        """Eigendecomposition of the diffusion operator (cached)
+
+        The diffusion operator `P = D^-1 K` is conjugate to the symmetric
+        matrix `A = D^1/2 P D^-1/2`, so we can compute its spectrum with
+        a single symmetric eigendecomposition `A = V diag(w) V^T`.
+
+        Returns
+        -------
+        eig : tuple (w, U, U_inv) or None
+            `diff_op = U diag(w) U_inv`, or None if the diffusion operator
+            has no symmetric conjugate
+        """
+        if self._diff_op_eig is None:
+            diff_op = self._graph_diff_op()
+            degree = self._diff_op_degree()
+            self._diff_op_eig = False
+            if degree is not None and degree.shape[0] == diff_op.shape[0]:
+                sqrt_degree = np.sqrt(degree)
+                if sparse.issparse(diff_op):
+                    A = sparse.diags(sqrt_degree).dot(diff_op)
+                    A = A.dot(sparse.diags(1 / sqrt_degree))
+                    # equivalent to np.allclose without densifying
+                    symmetric = (abs(A - A.T) - 1e-5 * abs(A.T)).max() <= 1e-8
+                    if symmetric:
+                        A = A.toarray()
+                else:
+                    A = diff_op * sqrt_degree[:, None] / sqrt_degree[None, :]
+                    symmetric = np.allclose(A, A.T)
+                if symmetric:
+                    # always double precision: the small entries of P^t that
+                    # the potential depends on are lost to cancellation in a
+                    # single precision eigenbasis
+                    A = ((A + A.T) / 2).astype(np.float64, copy=False)
+                    sqrt_degree = sqrt_degree.astype(np.float64)
+                    with _logger.task("eigendecomposition"):
+                        if self._use_gpu(A):
+                            w, V = cupy.linalg.eigh(cupy.asarray(A))
+                            w, V = cupy.asnumpy(w), cupy.asnumpy(V)
+                        else:
+                            w, V = linalg.eigh(A)
+                    self._diff_op_eig = (
+                        w,
+                        V / sqrt_degree[:, None],
+                        V.T * sqrt_degree[None, :],
+                    )
+                else:
+                    _logger.debug("Diffusion operator is not symmetrizable")
+        if self._diff_op_eig is False:
+            return None
+        return self._diff_op_eig
+
+    def _diff_op_power(self, t):
+        """Raise the diffusion operator to the power `t`
+
+        Uses the eigendecomposition of the diffusion operator where possible,
+        such that changing `t` only requires a single matrix product. Since
+        `w^t` decays rapidly, `P^t` is effectively low rank: only modes above
+        double precision are used, so the product costs `O(n^2 r)` for
+        rank `r`. The product is computed in double precision and cast to
+        `self.dtype` afterwards.
+
+        Parameters
+        ----------
+        t : int
+            power to which the diffusion operator is powered
+
+        Returns
+        -------
+        diff_op_t : array-like, shape=[n_samples, n_samples]
+            A newly allocated array of type `self.dtype`,
+            safe to modify in place
+        """
+        eig = self._diff_op_eigh()
+        if eig is None:
+            diff_op = np.ascontiguousarray(self.diff_op, dtype=self.dtype)
+            if self._use_gpu(diff_op):
+                return cupy.asnumpy(cupy.linalg.matrix_power(cupy.asarray(diff_op), t))
+            return _matrix_power(diff_op, t, scratch=self._diff_scratch)
+        w, U, U_inv = eig
+        w_t = w ** t
+        # drop modes that vanish at this precision
+        # (this also avoids slow arithmetic on subnormal numbers)
+        rank = np.abs(w_t) > np.finfo(w_t.dtype).eps * np.max(np.abs(w_t))
+        _logger.debug("Using {} of {} eigenvectors".format(np.sum(rank), len(w)))
+        diff_op_t = (U[:, rank] * w_t[rank]).dot(U_inv[rank])
+        # P^t is non-negative: remove numerical noise before taking logs
+        np.clip(diff_op_t, 0, None, out=diff_op_t)
+        return diff_op_t.astype(self.dtype, copy=False)
+
     def _von_neumann_entropy(self, t_max=100):
         """Calculate Von Neumann Entropy
 
@@ -1037,10 +1379,15 @@ class PHATE(BaseEstimator):
         t_opt : int
             The optimal value of t
         """
-        with _logger.task("optimal t"):
-            t, h = self._von_neumann_entropy(t_max=t_max)
-            t_opt = vne.find_knee_point(y=h, x=t)
-            _logger.info("Automatically selected t = {}".format(t_opt))
+        if self._vne is not None and self._vne[0] == t_max:
+            # diffusion operator unchanged since last search
+            _, t, h, t_opt = self._vne
+        else:
+            with _logger.task("optimal t"):
+                t, h = self._von_neumann_entropy(t_max=t_max)
+                t_opt = vne.find_knee_point(y=h, x=t)
+            self._vne = (t_max, t, h, t_opt)
+        _logger.info("Automatically selected t = {}".format(t_opt))
 
         if plot:
             if ax is None:
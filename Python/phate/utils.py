@@ -56,7 +56,7 @@ def check_in(choices, **params):
     Parameters
     ----------
 
-    choices : array-like, accepted values
+    choices : array-like or set, accepted values
 
     params : object
         Named arguments, parameters to be checked
@@ -67,9 +67,11 @@ def check_in(choices, **params):
     """
     for p in params:
         if params[p] not in choices:
+            if isinstance(choices, (set, frozenset)):
+                choices = sorted(choices)
             raise ValueError(
                 "{} value {} not recognized. Choose from {}".format(
-                    p, params[p], choices
+                    p, params[p], list(choices)
                 )
             )
 
@@ -103,11 +105,17 @@ def matrix_is_equivalent(X, Y):
     """
     Checks matrix equivalence with numpy, scipy and pandas
     """
-    return X is Y or (
-        isinstance(X, Y.__class__)
-        and X.shape == Y.shape
-        and np.sum((X != Y).sum()) == 0
-    )
+    if X is Y:
+        return True
+    elif not (isinstance(X, Y.__class__) and X.shape == Y.shape):
+        return False
+    elif isinstance(X, np.ndarray):
+        # compare a subsample of rows first so that differing data
+        # is rejected without scanning the whole matrix
+        stride = max(1, X.shape[0] // 64)
+        return np.array_equal(X[::stride], Y[::stride]) and np.array_equal(X, Y)
+    else:
+        return np.sum((X != Y).sum()) == 0
 
 
 def in_ipynb():
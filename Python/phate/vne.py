@@ -3,6 +3,7 @@
 
 from __future__ import print_function, division
 import numpy as np
+from scipy import sparse
 from scipy.linalg import svd
 
 # Von Neumann Entropy
@@ -16,6 +17,9 @@ def compute_von_neumann_entropy(data, t_max=100):
 
     Parameters
     ----------
+    data : array-like or sparse matrix, shape=[n, n]
+        Matrix of which to compute the entropy
+
     t_max : int, default: 100
         Maximum value of t to test
 
@@ -36,17 +40,38 @@ def compute_von_neumann_entropy(data, t_max=100):
     23
 
     """
-    _, eigenvalues, _ = svd(data)
-    entropy = []
-    eigenvalues_t = np.copy(eigenvalues)
-    for _ in range(t_max):
-        prob = eigenvalues_t / np.sum(eigenvalues_t)
-        prob = prob + np.finfo(float).eps
-        entropy.append(-np.sum(prob * np.log(prob)))
-        eigenvalues_t = eigenvalues_t * eigenvalues
-    entropy = np.array(entropy)
+    if sparse.issparse(data):
+        # the full spectrum is needed at small t
+        data = data.toarray()
+    eigenvalues = svd(data, compute_uv=False)
+    return compute_entropy_from_eigenvalues(eigenvalues, t_max=t_max)
+
+
+def compute_entropy_from_eigenvalues(eigenvalues, t_max=100):
+    """
+    Determines the Von Neumann entropy of a matrix with given
+    (non-negative) eigenvalues at varying matrix powers, without
+    recomputing the spectrum for each power.
 
-    return np.array(entropy)
+    Parameters
+    ----------
+    eigenvalues : array, shape=[n]
+        Eigenvalues (or singular values) of the matrix
+
+    t_max : int, default: 100
+        Maximum value of t to test
+
+    Returns
+    -------
+    entropy : array, shape=[t_max]
+        The entropy of the matrix for each value of t
+    """
+    eigenvalues = np.asarray(eigenvalues, dtype=np.float64)
+    eigenvalues_t = eigenvalues[None, :] ** np.arange(1, t_max + 1)[:, None]
+    prob = eigenvalues_t / np.sum(eigenvalues_t, axis=1, keepdims=True)
+    prob = prob + np.finfo(float).eps
+    entropy = -np.sum(prob * np.log(prob), axis=1)
+    return entropy
 
 
 def find_knee_point(y, x=None):
@@ -123,16 +148,20 @@ def find_knee_point(y, x=None):
     bbck = (-(sigma_x * sigma_xy - sigma_xx * sigma_y) / det)[::-1]
 
     # figure out the sum of per-point errors for left- and right- of-knee fits
-    error_curve = np.full_like(y, np.float("nan"))
-    for breakpt in np.arange(1, len(y) - 1):
-        delsfwd = (mfwd[breakpt - 1] * x[: breakpt + 1] + bfwd[breakpt - 1]) - y[
-            : breakpt + 1
-        ]
-        delsbck = (mbck[breakpt - 1] * x[breakpt:] + bbck[breakpt - 1]) - y[breakpt:]
-
-        error_curve[breakpt] = np.sum(np.abs(delsfwd)) + np.sum(np.abs(delsbck))
+    # for a block of breakpoints at a time: row j corresponds to breakpoint
+    # start + j, and blocks keep memory bounded for long curves
+    error_curve = np.empty(len(y) - 2)
+    idx = np.arange(len(y))[None, :]
+    block_size = max(1, 2 ** 20 // len(y))
+    for start in range(1, len(y) - 1, block_size):
+        breakpt = np.arange(start, min(start + block_size, len(y) - 1))[:, None]
+        delsfwd = (mfwd[breakpt - 1] * x[None, :] + bfwd[breakpt - 1]) - y[None, :]
+        delsbck = (mbck[breakpt - 1] * x[None, :] + bbck[breakpt - 1]) - y[None, :]
+        error = np.sum(np.where(idx <= breakpt, np.abs(delsfwd), 0), axis=1)
+        error += np.sum(np.where(idx >= breakpt, np.abs(delsbck), 0), axis=1)
+        error_curve[breakpt[:, 0] - 1] = error
 
     # find location of the min of the error curve
-    loc = np.argmin(error_curve[1:-1]) + 1
+    loc = np.argmin(error_curve) + 1
     knee_point = x[loc]
     return knee_point
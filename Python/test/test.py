@@ -15,9 +15,14 @@ import graphtools
 import pygsp
 import anndata
 import numpy as np
+import importlib
+import scipy.sparse
+import scipy.spatial
 from scipy.spatial.distance import pdist, squareform
 
 from nose.tools import assert_raises_regex, assert_warns_regex
+from types import SimpleNamespace
+from unittest import mock
 import re
 
 
@@ -67,9 +72,25 @@ def test_vne():
     X[3, 2] = 4
     h = phate.vne.compute_von_neumann_entropy(X)
     assert phate.vne.find_knee_point(h) == 23
+    _, s, _ = np.linalg.svd(X)
+    np.testing.assert_allclose(phate.vne.compute_entropy_from_eigenvalues(s), h)
     x = np.arange(20)
     y = np.exp(-x / 10)
     assert phate.vne.find_knee_point(y, x) == 8
+    # non-symmetrizable sparse operator
+    M, C = phate.tree.gen_dla(n_dim=50, n_branch=5, branch_length=300, seed=37)
+    phate_operator = phate.PHATE(
+        n_landmark=None, kernel_symm=None, random_state=42, verbose=False
+    ).fit(M)
+    h = phate.vne.compute_von_neumann_entropy(phate_operator.graph.diff_op)
+    h_dense = phate.vne.compute_von_neumann_entropy(phate_operator.diff_op)
+    np.testing.assert_allclose(h, h_dense)
+    assert phate.vne.find_knee_point(h) == phate.vne.find_knee_point(h_dense)
+    # automatic t uses the singular values of the diffusion operator
+    M, C = phate.tree.gen_dla(n_dim=50, n_branch=5, branch_length=200, seed=37)
+    phate_operator = phate.PHATE(n_landmark=None, verbose=False).fit(M)
+    assert phate_operator._find_optimal_t() == 37
+    assert isinstance(phate_operator.diff_op, np.ndarray)
 
 
 def test_tree():
@@ -128,9 +149,202 @@ def test_tree():
     np.testing.assert_allclose(
         phate_precomputed_D, phate_precomputed_distance, atol=5e-4
     )
+
+    phate_operator.set_params(skip_kernel=True)
+    phate_skip_kernel = phate_operator.fit_transform(K)
+    assert phate_skip_kernel.shape == (M.shape[0], 2)
+    assert_raises_message(
+        ValueError,
+        "Cannot transform additional data using a precomputed affinity matrix.",
+        phate_operator.transform,
+        K[:10],
+    )
+    # skipping the kernel reproduces the graphtools potential
+    for K in [scprep.utils.toarray(K), scipy.sparse.csr_matrix(K)]:
+        phate_operator = phate.PHATE(
+            knn_dist="precomputed_affinity", n_landmark=None, t=30, verbose=False
+        )
+        potential = phate_operator.fit(K).diff_potential
+        phate_operator.set_params(skip_kernel=True)
+        np.testing.assert_allclose(phate_operator.fit(K).diff_potential, potential)
     return 0
 
 
+def test_dtype():
+    M, C = phate.tree.gen_dla(n_dim=50, n_branch=5, branch_length=300, seed=37)
+    Y, P = {}, {}
+    for dtype in [np.float32, np.float64]:
+        phate_operator = phate.PHATE(
+            t=20, n_landmark=500, dtype=dtype, random_state=0, verbose=False
+        )
+        Y[dtype] = phate_operator.fit_transform(M)
+        P[dtype] = phate_operator.diff_potential
+    np.testing.assert_allclose(P[np.float32], P[np.float64], atol=1e-4)
+    _, _, disparity = scipy.spatial.procrustes(Y[np.float32], Y[np.float64])
+    assert disparity < 1e-3
+    for dtype in ["float16", "single precision"]:
+        assert_raises_message(
+            ValueError,
+            "dtype value {} not recognized. Choose from ['float32', 'float64']".format(
+                dtype
+            ),
+            phate.PHATE,
+            dtype=dtype,
+        )
+
+
+def test_landmark_params():
+    M, C = phate.tree.gen_dla(n_dim=50, n_branch=5, branch_length=300, seed=37)
+    phate_operator = phate.PHATE(
+        t=20, n_landmark=500, random_state=42, verbose=False
+    )
+    phate_operator.fit_transform(M)
+    # graphtools recomputes the landmarks
+    phate_operator.set_params(n_svd=30, t=21)
+    Y = phate_operator.transform()
+    assert Y.shape == (M.shape[0], 2)
+    # a warm refit after changing n_landmark reuses the operator
+    phate_operator.set_params(n_landmark=200)
+    Y = phate_operator.transform()
+    eig = phate_operator._diff_op_eigh()
+    np.testing.assert_array_equal(phate_operator.fit_transform(M), Y)
+    assert phate_operator._diff_op_eigh() is eig
+
+
+def test_diff_op_power():
+    M, C = phate.tree.gen_dla(n_dim=50, n_branch=4, branch_length=100, seed=37)
+    for n_landmark in [100, None]:
+        phate_operator = phate.PHATE(
+            n_landmark=n_landmark, dtype=np.float64, random_state=42, verbose=False
+        ).fit(M)
+        assert phate_operator._diff_op_eigh() is not None
+        diff_op = scprep.utils.toarray(phate_operator.diff_op)
+        for t in [1, 2, 7, 30]:
+            np.testing.assert_allclose(
+                phate_operator._diff_op_power(t),
+                np.linalg.matrix_power(diff_op, t),
+                atol=1e-12,
+            )
+
+
+def test_matrix_power():
+    from phate.phate import _matrix_power
+
+    A = np.random.RandomState(42).uniform(0, 1, (20, 20))
+    A = A / A.sum(axis=1, keepdims=True)
+    A_copy = A.copy()
+    scratch = []
+    for t in [1, 2, 3, 8, 13]:
+        A_t = _matrix_power(A, t, scratch=scratch)
+        assert A_t is not A
+        assert not any(A_t is b for b in scratch)
+        np.testing.assert_allclose(A_t, np.linalg.matrix_power(A, t))
+    np.testing.assert_array_equal(A, A_copy)
+    # non-symmetrizable operators fall back to the matrix power
+    M, C = phate.tree.gen_dla(n_dim=50, n_branch=4, branch_length=100, seed=37)
+    phate_operator = phate.PHATE(
+        n_landmark=None,
+        kernel_symm=None,
+        dtype=np.float64,
+        random_state=42,
+        verbose=False,
+    ).fit(M)
+    assert phate_operator._diff_op_eigh() is None
+    diff_op = scprep.utils.toarray(phate_operator.diff_op)
+    for t in [1, 2, 7, 30]:
+        np.testing.assert_allclose(
+            phate_operator._diff_op_power(t), np.linalg.matrix_power(diff_op, t)
+        )
+
+
+def test_backend():
+    phate_module = importlib.import_module("phate.phate")
+    M, C = phate.tree.gen_dla(n_dim=50, n_branch=4, branch_length=50, seed=37)
+    params = dict(n_landmark=None, t=20, random_state=42, verbose=False)
+    if not hasattr(phate_module, "cupy"):
+        assert_raises_message(
+            ImportError,
+            "cupy not found. Please install cupy or use backend='numpy'",
+            phate.PHATE(backend="cupy", **params).fit_transform,
+            M,
+        )
+
+    # mock cupy on top of numpy
+    class CUDARuntimeError(RuntimeError):
+        pass
+
+    calls = []
+    free_memory = [np.inf]
+
+    def eigh(A):
+        calls.append((A.dtype, "eigh"))
+        return np.linalg.eigh(A)
+
+    def matrix_power(A, t):
+        calls.append((A.dtype, "matrix_power"))
+        return np.linalg.matrix_power(A, t)
+
+    def memGetInfo():
+        if free_memory[0] is None:
+            raise CUDARuntimeError("no CUDA-capable device is detected")
+        return free_memory[0], free_memory[0]
+
+    cupy = SimpleNamespace(
+        asarray=np.asarray,
+        asnumpy=np.asarray,
+        linalg=SimpleNamespace(eigh=eigh, matrix_power=matrix_power),
+        cuda=SimpleNamespace(
+            runtime=SimpleNamespace(
+                memGetInfo=memGetInfo, CUDARuntimeError=CUDARuntimeError
+            )
+        ),
+    )
+    potential = (
+        phate.PHATE(backend="numpy", **params).fit(M)._calculate_potential()
+    )
+    n = potential.shape[0]
+    with mock.patch.object(phate_module, "cupy", cupy, create=True):
+        phate_operator = phate.PHATE(backend="cupy", **params).fit(M)
+        np.testing.assert_allclose(
+            phate_operator._calculate_potential(), potential, atol=1e-5
+        )
+        assert calls == [(np.float64, "eigh")]
+        # the matrix power runs in the potential's dtype
+        phate.PHATE(backend="cupy", kernel_symm=None, **params).fit(
+            M
+        )._calculate_potential()
+        assert calls[-1] == (np.float32, "matrix_power")
+        # the double precision eigendecomposition needs 3 n^2 doubles
+        calls.clear()
+        free_memory[0] = 3 * n * n * 4
+        phate.PHATE(**params).fit(M)._calculate_potential()
+        assert calls == []
+        free_memory[0] = 3 * n * n * 8
+        phate.PHATE(**params).fit(M)._calculate_potential()
+        assert calls == [(np.float64, "eigh")]
+        # no GPU
+        calls.clear()
+        free_memory[0] = None
+        phate.PHATE(**params).fit(M)._calculate_potential()
+        assert calls == []
+        assert_raises_message(
+            CUDARuntimeError,
+            "no CUDA-capable device is detected",
+            phate.PHATE(backend="cupy", **params).fit(M)._calculate_potential,
+        )
+
+
+def test_sgd_init():
+    X = np.random.RandomState(42).normal(0, 1, (100, 10))
+    D = squareform(pdist(X))
+    # s_gd2 writes into C-contiguous double precision layouts
+    Y_classic = np.ascontiguousarray(phate.mds.classic(D, random_state=42))
+    init = Y_classic.copy()
+    Y = phate.mds.sgd(D, random_state=42, init=Y_classic)
+    np.testing.assert_array_equal(Y_classic, init)
+    assert not np.allclose(Y, Y_classic)
+
+
 def test_bmmsc():
     data_dir = os.path.join("..", "data")
     if not os.path.isdir(data_dir):